@@ -4,12 +4,19 @@
 # ===========================================================
 
 from abc import ABC, abstractmethod
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
 import streamlit as st
+from trade_kernels import portfolio_figures, trade_summary
 
 # ------------------------------
 # Exchange Rate Manager
 # ------------------------------
 class ExchangeManager:
+    # Currency order of rate_lut
+    CURRENCIES = ("USD", "EUR", "AED", "INR")
+
     def __init__(self):
         self.rates = {
             "USD": 83.0,
@@ -17,18 +24,43 @@ class ExchangeManager:
             "AED": 22.6,
             "INR": 1.0
         } 
+        # Multipliers to and from INR, so no division is left on the hot path
+        self._mul_to_inr = {k.upper(): v for k, v in self.rates.items()}
+        self._div_from_inr = {k.upper(): 1.0 / v for k, v in self.rates.items()}
+        # Precomputed (from, to) conversion ratios, so convert() is a single lookup
+        self.ratio = {(a, b): self._mul_to_inr[a] * self._div_from_inr[b]
+                      for a in self._mul_to_inr for b in self._div_from_inr}
+        # INR multipliers indexed like CURRENCIES, for the NumPy product arrays
+        self.rate_lut = np.array([self._mul_to_inr[c] for c in self.CURRENCIES])
 
     def get_rate(self, currency):
         return self.rates.get(currency.upper(), 1.0)
 
     def convert(self, amount, from_currency, to_currency="INR"):
-        rate = self.get_rate(from_currency) / self.get_rate(to_currency)
+        from_currency, to_currency = from_currency.upper(), to_currency.upper()
+        if from_currency == to_currency:
+            return amount
+        rate = self.ratio.get((from_currency, to_currency))
+        if rate is None:
+            # Unknown currency: fall back to the default rate of 1.0
+            rate = self._mul_to_inr.get(from_currency, 1.0) * self._div_from_inr.get(to_currency, 1.0)
         return amount * rate
 
+@st.cache_resource
+def _exchange_manager():
+    # One shared manager, so cache misses in convert_currency() don't rebuild the rate tables
+    return ExchangeManager()
+
+@st.cache_data
+def convert_currency(amount, from_currency, to_currency="INR"):
+    return _exchange_manager().convert(amount, from_currency, to_currency)
+
 # ------------------------------
 # Product Class
 # ------------------------------
 class Product:
+    __slots__ = ("name", "hs_code", "quantity", "price_per_unit", "currency")
+
     def __init__(self, name, hs_code, quantity, price_per_unit, currency):
         self.name = name
         self.hs_code = hs_code
@@ -39,29 +71,152 @@ class Product:
     def total_value(self):
         return self.quantity * self.price_per_unit
 
+# ------------------------------
+# Trade Logistics & Financials
+# ------------------------------
+class ImportLogistics(NamedTuple):
+    freight: float = 0.0
+    insurance: float = 0.0
+    port_handling: float = 0.0
+    warehousing: float = 0.0
+    demurrage: float = 0.0
+
+class ExportLogistics(NamedTuple):
+    freight: float = 0.0
+    insurance: float = 0.0
+    port_handling: float = 0.0
+    warehousing: float = 0.0
+
+class ImportFinancials(NamedTuple):
+    customs_duty: float = 10.0
+    gst: float = 18.0
+    finance_interest: float = 0.02
+    commission: float = 0.0
+    margin: float = 20.0
+
+class ExportFinancials(NamedTuple):
+    export_incentive: float = 5.0
+    tax_rebate: float = 3.0
+    bank_charges: float = 0.5
+    commission: float = 2.0
+    margin: float = 25.0
+
+# ------------------------------
+# Trade Summary Inputs
+# ------------------------------
+# Arguments of trade_kernels.trade_summary, see there for the meaning of rate_a/b/c.
+class SummaryInputs(NamedTuple):
+    qty: np.ndarray
+    price: np.ndarray
+    cur_idx: np.ndarray
+    rate_lut: np.ndarray
+    logistics_total: float
+    misc_total: float
+    rate_a: float
+    rate_b: float
+    rate_c: float
+    commission: float
+    margin: float
+    is_import: bool
+
 # ------------------------------
 # Abstract Trade Class
 # ------------------------------
 class BaseTrade(ABC):
-    def __init__(self, trade_type, exchange_manager: ExchangeManager):
+    __slots__ = ("trade_type", "exchange", "products", "financials", "logistics", "misc_costs",
+                 "_logistics_total", "_misc_total", "_qty", "_price", "_cur_idx",
+                 "_summary_cache")
+
+    # Position of each currency in ExchangeManager.rate_lut
+    _CURRENCY_INDEX = {c: i for i, c in enumerate(ExchangeManager.CURRENCIES)}
+
+    def __init__(self, trade_type, exchange_manager: ExchangeManager,
+                 logistics: ImportLogistics | ExportLogistics,
+                 financials: ImportFinancials | ExportFinancials):
         self.trade_type = trade_type
         self.exchange = exchange_manager
         self.products = []
-        self.financials = {}
-        self.logistics = {}
+        self.financials = financials
+        self.logistics = logistics
         self.misc_costs = {}
+        self._logistics_total = sum(logistics)
+        self._misc_total = 0.0
+        # Product data kept as parallel arrays for vectorized summaries
+        self._qty = []
+        self._price = []
+        self._cur_idx = []
+        # Cached summary_figures() tuple; reset whenever the trade changes
+        self._summary_cache = None
 
     def add_product(self, product: Product):
         self.products.append(product)
+        self._qty.append(float(product.quantity))
+        self._price.append(float(product.price_per_unit))
+        # Unknown currencies map to INR, matching ExchangeManager's 1.0 default
+        self._cur_idx.append(self._CURRENCY_INDEX.get(product.currency.upper(), self._CURRENCY_INDEX["INR"]))
+        self._summary_cache = None
+
+    @abstractmethod
+    def _summary_args(self):
+        # (rate_a, rate_b, rate_c, commission, margin, is_import) as taken by the kernels
+        pass
 
-    def set_logistics(self, **kwargs):
-        self.logistics = kwargs
+    def summary_inputs(self):
+        rate_a, rate_b, rate_c, commission, margin, is_import = self._summary_args()
+        return SummaryInputs(
+            np.asarray(self._qty, dtype=np.float64),
+            np.asarray(self._price, dtype=np.float64),
+            np.asarray(self._cur_idx, dtype=np.int64),
+            self.exchange.rate_lut,
+            float(self._logistics_total), float(self._misc_total),
+            float(rate_a), float(rate_b), float(rate_c), float(commission), float(margin),
+            bool(is_import)
+        )
 
-    def set_financials(self, **kwargs):
-        self.financials = kwargs
+    def summary_figures(self):
+        # (total, cost, selling_value, profit, margin) in INR, computed once per change
+        if self._summary_cache is None:
+            self._summary_cache = trade_summary(*self.summary_inputs())
+        return self._summary_cache
+
+    @staticmethod
+    def batch_summary_figures(trades):
+        # Like summary_figures() for each trade, but all stale trades share one kernel call
+        stale = [trade for trade in trades if trade._summary_cache is None]
+        if stale:
+            inputs = [trade.summary_inputs() for trade in stale]
+            empty = np.empty(0)
+            qty = np.concatenate([empty] + [i.qty for i in inputs])
+            price = np.concatenate([empty] + [i.price for i in inputs])
+            rate = np.concatenate([empty] + [i.rate_lut[i.cur_idx] for i in inputs])
+            offsets = np.cumsum([0] + [len(i.qty) for i in inputs]).astype(np.int64)
+
+            results = portfolio_figures(
+                qty * price * rate,
+                offsets,
+                np.array([i.logistics_total for i in inputs], dtype=np.float64),
+                np.array([i.misc_total for i in inputs], dtype=np.float64),
+                np.array([(i.rate_a, i.rate_b, i.rate_c, i.commission, i.margin) for i in inputs],
+                         dtype=np.float64).reshape(-1, 5),
+                np.array([i.is_import for i in inputs], dtype=np.bool_)
+            )
+            for trade, figures in zip(stale, zip(*(r.tolist() for r in results))):
+                trade._summary_cache = figures
+        return [trade._summary_cache for trade in trades]
+
+    def set_logistics(self, logistics: ImportLogistics | ExportLogistics):
+        self.logistics = logistics
+        self._logistics_total = sum(logistics)
+        self._summary_cache = None
+
+    def set_financials(self, financials: ImportFinancials | ExportFinancials):
+        self.financials = financials
+        self._summary_cache = None
 
     def set_misc_costs(self, **kwargs):
         self.misc_costs = kwargs
+        self._misc_total = sum(kwargs.values())
+        self._summary_cache = None
 
     @abstractmethod
     def calculate_summary(self):
@@ -71,31 +226,17 @@ class BaseTrade(ABC):
 # Import Trade
 # ------------------------------
 class ImportTrade(BaseTrade):
-    def __init__(self, exchange_manager):
-        super().__init__("Import", exchange_manager)
+    __slots__ = ()
 
-    def calculate_summary(self):
-        total_cif_inr = sum(
-            self.exchange.convert(p.total_value(), p.currency, "INR") for p in self.products
-        )
-
-        logistics_total = sum(self.logistics.values())
-        misc_total = sum(self.misc_costs.values())
-
-        duty_rate = self.financials.get("customs_duty", 10)
-        gst_rate = self.financials.get("gst", 18)
-        finance_cost = self.financials.get("finance_interest", 0.02)
-        commission = self.financials.get("commission", 0)
-        margin = self.financials.get("margin", 20)
+    def __init__(self, exchange_manager):
+        super().__init__("Import", exchange_manager, ImportLogistics(), ImportFinancials())
 
-        customs_duty = total_cif_inr * duty_rate / 100
-        gst = (total_cif_inr + customs_duty) * gst_rate / 100
-        interest = total_cif_inr * finance_cost
-        commission_amount = total_cif_inr * commission / 100
+    def _summary_args(self):
+        f = self.financials
+        return f.customs_duty, f.gst, f.finance_interest, f.commission, f.margin, True
 
-        landed_cost = total_cif_inr + logistics_total + misc_total + customs_duty + gst + interest + commission_amount
-        selling_value = landed_cost * (1 + margin / 100)
-        profit = selling_value - landed_cost
+    def calculate_summary(self):
+        total_cif_inr, landed_cost, selling_value, profit, margin_pct = self.summary_figures()
 
         return {
             "type": "Import",
@@ -103,38 +244,24 @@ class ImportTrade(BaseTrade):
             "landed_cost": landed_cost,
             "selling_value": selling_value,
             "profit": profit,
-            "margin": (profit / landed_cost) * 100
+            "margin": margin_pct
         }
 
 # ------------------------------
 # Export Trade
 # ------------------------------
 class ExportTrade(BaseTrade):
-    def __init__(self, exchange_manager):
-        super().__init__("Export", exchange_manager)
+    __slots__ = ()
 
-    def calculate_summary(self):
-        total_fob_inr = sum(
-            self.exchange.convert(p.total_value(), p.currency, "INR") for p in self.products
-        )
-
-        logistics_total = sum(self.logistics.values())
-        misc_total = sum(self.misc_costs.values())
-
-        incentive_rate = self.financials.get("export_incentive", 5)
-        tax_rebate = self.financials.get("tax_rebate", 3)
-        bank_charges = self.financials.get("bank_charges", 0.5)
-        commission = self.financials.get("commission", 2)
-        margin = self.financials.get("margin", 25)
+    def __init__(self, exchange_manager):
+        super().__init__("Export", exchange_manager, ExportLogistics(), ExportFinancials())
 
-        incentive = total_fob_inr * incentive_rate / 100
-        rebate = total_fob_inr * tax_rebate / 100
-        commission_amount = total_fob_inr * commission / 100
-        bank_fee = total_fob_inr * bank_charges / 100
+    def _summary_args(self):
+        f = self.financials
+        return f.export_incentive, f.tax_rebate, f.bank_charges, f.commission, f.margin, False
 
-        adjusted_cost = total_fob_inr + logistics_total + misc_total - incentive - rebate + commission_amount + bank_fee
-        selling_value = adjusted_cost * (1 + margin / 100)
-        profit = selling_value - adjusted_cost
+    def calculate_summary(self):
+        total_fob_inr, adjusted_cost, selling_value, profit, margin_pct = self.summary_figures()
 
         return {
             "type": "Export",
@@ -142,7 +269,7 @@ class ExportTrade(BaseTrade):
             "adjusted_cost": adjusted_cost,
             "selling_value": selling_value,
             "profit": profit,
-            "margin": (profit / adjusted_cost) * 100
+            "margin": margin_pct
         }
 
 # ------------------------------
@@ -156,117 +283,138 @@ class TradePortfolio:
     def add_trade(self, trade: BaseTrade):
         self.trades.append(trade)
 
+    def summary_frame(self):
+        # Reuses each trade's cached figures; only trades changed since the last call are recomputed
+        figures = np.array(BaseTrade.batch_summary_figures(self.trades), dtype=np.float64).reshape(-1, 5)
+        totals, cost, selling_value, profit, margin_pct = figures.T
+        return pd.DataFrame({
+            "type": [trade.trade_type for trade in self.trades],
+            "total_value": totals,
+            "cost": cost,
+            "selling_value": selling_value,
+            "profit": profit,
+            "margin": margin_pct
+        })
+
     def portfolio_summary(self):
-        total_profit = 0
         st.subheader(f"🌎 Trade Portfolio Summary: {self.owner}")
-        for trade in self.trades:
-            summary = trade.calculate_summary()
-            total_profit += summary["profit"]
-            st.markdown(f"### 🔹 {summary['type']} Trade Summary")
-            st.write(summary)
+        df = self.summary_frame()
+        st.table(df.set_index("type"))
+        total_profit = df["profit"].sum()
         st.success(f"💰 Total Portfolio Profit: ₹{total_profit:,.2f}")
 
 # ------------------------------
 # Streamlit App
 # ------------------------------
+def _product_editor(key, num_products):
+    # One table widget for all product rows instead of five widgets per product
+    df = pd.DataFrame({
+        "name": [""] * num_products,
+        "hs_code": [""] * num_products,
+        "quantity": [1] * num_products,
+        "price": [0.0] * num_products,
+        "currency": ["USD"] * num_products
+    })
+    return st.data_editor(df, key=key, hide_index=True, column_config={
+        "name": st.column_config.TextColumn("Name"),
+        "hs_code": st.column_config.TextColumn("HS Code"),
+        "quantity": st.column_config.NumberColumn("Quantity", min_value=1, step=1, required=True),
+        "price": st.column_config.NumberColumn("Price per Unit", min_value=0.0, required=True),
+        "currency": st.column_config.SelectboxColumn("Currency", options=list(ExchangeManager.CURRENCIES),
+                                                     required=True)
+    })
+
+IMPORT_MISC = ["documentation", "transport"]
+EXPORT_MISC = ["certification", "packaging"]
+# Form defaults, in percent (finance interest is converted to a fraction on read)
+IMPORT_FINANCIAL_DEFAULTS = {"customs_duty": 10.0, "gst": 18.0, "finance_interest": 1.5,
+                             "commission": 1.0, "margin": 25.0}
+EXPORT_FINANCIAL_DEFAULTS = {"export_incentive": 5.0, "tax_rebate": 3.0, "bank_charges": 0.5,
+                             "commission": 2.0, "margin": 20.0}
+_FIELD_LABELS = {"gst": "GST"}
+
+def _render_fields(prefix, fields, defaults, suffix=""):
+    return {
+        f: st.number_input(_FIELD_LABELS.get(f, f.replace("_", " ").title()) + suffix,
+                           min_value=0.0, value=defaults.get(f, 0.0), key=f"{prefix}_{f}")
+        for f in fields
+    }
+
+def _products_from_editor(edited):
+    products = []
+    for row in edited.itertuples(index=False):
+        # Cleared text cells come back as None/NaN rather than ""
+        name = row.name if pd.notna(row.name) else ""
+        if not name:
+            continue
+        hs_code = row.hs_code if pd.notna(row.hs_code) else ""
+        products.append(Product(name, hs_code, int(row.quantity), float(row.price), row.currency))
+    return products
+
 def main():
     st.title("🌍 TradeIntelliPro - Import/Export Calculator")
-    ex = ExchangeManager()
-    portfolio = TradePortfolio("Gnaneswar Somisetty")
+    # Persist state across Streamlit reruns instead of rebuilding it each time
+    if "portfolio" not in st.session_state:
+        st.session_state.portfolio = TradePortfolio("Gnaneswar Somisetty")
+        st.session_state.ex = _exchange_manager()
+    portfolio = st.session_state.portfolio
 
     # ---------------- Currency Converter ----------------
     st.header("💱 Currency Converter")
     amount = st.number_input("Amount", min_value=0.0, value=1000.0)
     from_currency = st.selectbox("From Currency", ["USD", "EUR", "AED", "INR"], key="conv_from")
     to_currency = st.selectbox("To Currency", ["USD", "EUR", "AED", "INR"], key="conv_to")
-    converted = ex.convert(amount, from_currency, to_currency)
+    converted = convert_currency(amount, from_currency, to_currency)
     st.info(f"Converted Amount: {converted:,.2f} {to_currency}")
 
     # ---------------- Import Trade ----------------
     st.header("🟢 Import Trade")
-    imp = ImportTrade(ex)
     with st.form("import_form"):
         num_products = st.number_input("Number of import products", min_value=1, max_value=10, value=2)
-        import_products = []
-        for i in range(num_products):
-            st.markdown(f"**Product {i+1}**")
-            name = st.text_input(f"Name {i+1}", key=f"imp_name_{i}")
-            hs = st.text_input(f"HS Code {i+1}", key=f"imp_hs_{i}")
-            qty = st.number_input(f"Quantity {i+1}", min_value=1, key=f"imp_qty_{i}")
-            price = st.number_input(f"Price per Unit {i+1}", min_value=0.0, key=f"imp_price_{i}")
-            currency = st.selectbox(f"Currency {i+1}", ["USD", "EUR", "AED", "INR"], key=f"imp_cur_{i}")
-            if name:
-                import_products.append(Product(name, hs, qty, price, currency))
+        import_products = _product_editor("imp_products", num_products)
 
         # Logistics, Misc, Financials
         st.subheader("Logistics & Misc Costs")
-        freight = st.number_input("Freight", min_value=0.0, value=0.0)
-        insurance = st.number_input("Insurance", min_value=0.0, value=0.0)
-        port_handling = st.number_input("Port Handling", min_value=0.0, value=0.0)
-        warehousing = st.number_input("Warehousing", min_value=0.0, value=0.0)
-        demurrage = st.number_input("Demurrage", min_value=0.0, value=0.0)
-        documentation = st.number_input("Documentation", min_value=0.0, value=0.0)
-        transport = st.number_input("Transport", min_value=0.0, value=0.0)
+        logistics = _render_fields("imp", ImportLogistics._fields, {})
+        misc_costs = _render_fields("imp", IMPORT_MISC, {})
 
         st.subheader("Financials")
-        customs_duty = st.number_input("Customs Duty (%)", min_value=0.0, value=10.0)
-        gst = st.number_input("GST (%)", min_value=0.0, value=18.0)
-        finance_interest = st.number_input("Finance Interest (%)", min_value=0.0, value=1.5)/100
-        commission = st.number_input("Commission (%)", min_value=0.0, value=1.0)
-        margin = st.number_input("Margin (%)", min_value=0.0, value=25.0)
+        financials = _render_fields("imp", ImportFinancials._fields, IMPORT_FINANCIAL_DEFAULTS, " (%)")
 
         submitted = st.form_submit_button("Calculate Import Trade")
         if submitted:
-            for p in import_products:
+            imp = ImportTrade(st.session_state.ex)
+            for p in _products_from_editor(import_products):
                 imp.add_product(p)
-            imp.set_logistics(freight=freight, insurance=insurance, port_handling=port_handling,
-                              warehousing=warehousing, demurrage=demurrage)
-            imp.set_misc_costs(documentation=documentation, transport=transport)
-            imp.set_financials(customs_duty=customs_duty, gst=gst,
-                               finance_interest=finance_interest, commission=commission, margin=margin)
-            portfolio.add_trade(imp)
+            imp.set_logistics(ImportLogistics(**logistics))
+            imp.set_misc_costs(**misc_costs)
+            financials["finance_interest"] /= 100
+            imp.set_financials(ImportFinancials(**financials))
+            st.session_state.portfolio.add_trade(imp)
             st.success("✅ Import Trade added to portfolio.")
 
     # ---------------- Export Trade ----------------
     st.header("🔵 Export Trade")
-    exp = ExportTrade(ex)
     with st.form("export_form"):
         num_products = st.number_input("Number of export products", min_value=1, max_value=10, value=2, key="num_exp")
-        export_products = []
-        for i in range(num_products):
-            st.markdown(f"**Product {i+1}**")
-            name = st.text_input(f"Name {i+1}", key=f"exp_name_{i}")
-            hs = st.text_input(f"HS Code {i+1}", key=f"exp_hs_{i}")
-            qty = st.number_input(f"Quantity {i+1}", min_value=1, key=f"exp_qty_{i}")
-            price = st.number_input(f"Price per Unit {i+1}", min_value=0.0, key=f"exp_price_{i}")
-            currency = st.selectbox(f"Currency {i+1}", ["USD", "EUR", "AED", "INR"], key=f"exp_cur_{i}")
-            if name:
-                export_products.append(Product(name, hs, qty, price, currency))
+        export_products = _product_editor("exp_products", num_products)
 
         st.subheader("Logistics & Misc Costs")
-        freight = st.number_input("Freight", min_value=0.0, value=0.0, key="exp_freight")
-        insurance = st.number_input("Insurance", min_value=0.0, value=0.0, key="exp_insurance")
-        port_handling = st.number_input("Port Handling", min_value=0.0, value=0.0, key="exp_port")
-        warehousing = st.number_input("Warehousing", min_value=0.0, value=0.0, key="exp_ware")
-        certification = st.number_input("Certification", min_value=0.0, value=0.0)
-        packaging = st.number_input("Packaging", min_value=0.0, value=0.0)
+        logistics = _render_fields("exp", ExportLogistics._fields, {})
+        misc_costs = _render_fields("exp", EXPORT_MISC, {})
 
         st.subheader("Financials")
-        export_incentive = st.number_input("Export Incentive (%)", min_value=0.0, value=5.0)
-        tax_rebate = st.number_input("Tax Rebate (%)", min_value=0.0, value=3.0)
-        bank_charges = st.number_input("Bank Charges (%)", min_value=0.0, value=0.5)
-        commission = st.number_input("Commission (%)", min_value=0.0, value=2.0)
-        margin = st.number_input("Margin (%)", min_value=0.0, value=20.0)
+        financials = _render_fields("exp", ExportFinancials._fields, EXPORT_FINANCIAL_DEFAULTS, " (%)")
 
         submitted = st.form_submit_button("Calculate Export Trade")
         if submitted:
-            for p in export_products:
+            exp = ExportTrade(st.session_state.ex)
+            for p in _products_from_editor(export_products):
                 exp.add_product(p)
-            exp.set_logistics(freight=freight, insurance=insurance, port_handling=port_handling, warehousing=warehousing)
-            exp.set_misc_costs(certification=certification, packaging=packaging)
-            exp.set_financials(export_incentive=export_incentive, tax_rebate=tax_rebate,
-                               bank_charges=bank_charges, commission=commission, margin=margin)
-            portfolio.add_trade(exp)
+            exp.set_logistics(ExportLogistics(**logistics))
+            exp.set_misc_costs(**misc_costs)
+            exp.set_financials(ExportFinancials(**financials))
+            st.session_state.portfolio.add_trade(exp)
             st.success("✅ Export Trade added to portfolio.")
 
     # ---------------- Portfolio Summary ----------------
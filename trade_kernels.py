@@ -0,0 +1,62 @@
+# ===========================================================
+# 🌍 TradeIntelliPro - Numba trade summary kernels
+# by Gnaneswar Somisetty
+# ===========================================================
+# Kept out of the Streamlit script: Streamlit re-executes the script on every
+# rerun but not the modules it imports, so with explicit signatures and
+# cache=True each kernel compiles (or loads from numba's on-disk cache, which
+# is invalidated when this file changes) once per process.
+#
+# Import: rate_a/b/c are customs duty (%), GST (%) and finance interest (fraction).
+# Export: rate_a/b/c are export incentive (%), tax rebate (%) and bank charges (%).
+
+import numpy as np
+from numba import njit
+
+@njit("Tuple((f8,f8,f8,f8))(f8,f8,f8,f8,f8,f8,f8,f8,b1)", cache=True)
+def trade_figures(total, logistics_total, misc_total, rate_a, rate_b, rate_c,
+                  commission, margin, is_import):
+    # The import/export cost rules; shared by the single-trade and portfolio kernels
+    commission_amount = total * commission / 100
+    if is_import:
+        customs_duty = total * rate_a / 100
+        gst = (total + customs_duty) * rate_b / 100
+        interest = total * rate_c
+        cost = total + logistics_total + misc_total + customs_duty + gst + interest + commission_amount
+    else:
+        incentive = total * rate_a / 100
+        rebate = total * rate_b / 100
+        bank_fee = total * rate_c / 100
+        cost = total + logistics_total + misc_total - incentive - rebate + commission_amount + bank_fee
+    selling_value = cost * (1 + margin / 100)
+    profit = selling_value - cost
+    # A trade with no product value has zero cost; report its margin as NaN
+    margin_pct = (profit / cost) * 100 if cost != 0 else np.nan
+    return cost, selling_value, profit, margin_pct
+
+@njit("Tuple((f8,f8,f8,f8,f8))(f8[:],f8[:],i8[:],f8[:],f8,f8,f8,f8,f8,f8,f8,b1)", cache=True)
+def trade_summary(qty, price, cur_idx, rate_lut, logistics_total, misc_total,
+                  rate_a, rate_b, rate_c, commission, margin, is_import):
+    total = (qty * price * rate_lut[cur_idx]).sum()
+    cost, selling_value, profit, margin_pct = trade_figures(
+        total, logistics_total, misc_total, rate_a, rate_b, rate_c, commission, margin, is_import
+    )
+    return total, cost, selling_value, profit, margin_pct
+
+@njit("Tuple((f8[:],f8[:],f8[:],f8[:],f8[:]))(f8[:],i8[:],f8[:],f8[:],f8[:,:],b1[:])", cache=True)
+def portfolio_figures(values, offsets, logistics_total, misc_total, rates, is_import):
+    # values holds the INR value of every product; trade i owns values[offsets[i]:offsets[i + 1]]
+    n = len(offsets) - 1
+    totals = np.empty(n)
+    cost = np.empty(n)
+    selling_value = np.empty(n)
+    profit = np.empty(n)
+    margin_pct = np.empty(n)
+    for i in range(n):
+        # Sum each segment on its own, like trade_summary does; an empty segment sums to 0.0
+        totals[i] = values[offsets[i]:offsets[i + 1]].sum()
+        cost[i], selling_value[i], profit[i], margin_pct[i] = trade_figures(
+            totals[i], logistics_total[i], misc_total[i],
+            rates[i, 0], rates[i, 1], rates[i, 2], rates[i, 3], rates[i, 4], is_import[i]
+        )
+    return totals, cost, selling_value, profit, margin_pct